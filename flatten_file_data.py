@@ -5,12 +5,55 @@ This script parses a directory structure, combining the contents of .py and .xml
 into a single output file. It ignores specified folders and provides detailed output.
 Usage: python directory_parser.py <root_directory> [output_file]
 """
+import errno
+import mmap
 import os
+import queue
+import shutil
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import islice
+from typing import Callable, Collection, Iterator, Optional, Tuple, Union
+
+try:
+    # Optional native accelerator, built with: cythonize -i _flatten_native.pyx
+    from _flatten_native import walk_and_concat
+except ImportError:
+    walk_and_concat = None
 
 INCLUDE_FILES = ('.py', '.xml')
 SKIP_FOLDERS = ['tests', 'static', "__pycache__", "i18n"]
+SKIP_FOLDERS_SET = frozenset(SKIP_FOLDERS)
+COPY_BUFFER_SIZE = 1 << 20
+# sendfile between two regular files is only supported on Linux; elsewhere it needs a socket
+SENDFILE_TO_FILE = hasattr(os, 'sendfile') and sys.platform.startswith('linux')
+NEWLINES = b"\n\n"
+# Files up to this size are read into the write batch; larger ones are copied with sendfile
+SMALL_FILE_SIZE = 64 * 1024
+BATCH_FILES = 256
+# Where sendfile is unsupported, files above this size are written straight from a memory map
+MMAP_THRESHOLD = 1 << 20
+# Most platforms cap the number of buffers per writev call at 1024
+IOV_MAX = 1024
+READ_WORKERS = 8
+DEFAULT_WALK_WORKERS = 4
+
+def _walk_workers_from_env() -> int:
+    """
+    Read the number of directory listing threads from FLATTEN_WALK_WORKERS.
+    Listing in parallel contends on a volume lock on macOS beyond ~4 threads, while
+    Linux file systems often benefit from more, so the default can be overridden.
+    Returns:
+    int: The configured thread count, or DEFAULT_WALK_WORKERS if unset or invalid.
+    """
+    try:
+        return max(1, int(os.environ.get('FLATTEN_WALK_WORKERS', DEFAULT_WALK_WORKERS)))
+    except ValueError:
+        return DEFAULT_WALK_WORKERS
+
+WALK_WORKERS = _walk_workers_from_env()
 
 def parse_folder(root_dir: str, output_file: str) -> None:
     """
@@ -19,26 +62,239 @@ def parse_folder(root_dir: str, output_file: str) -> None:
     root_dir (str): The root directory to start parsing from.
     output_file (str): The file to write the parsed contents to.
     """
-    with open(output_file, 'a', encoding='utf-8') as outfile:
-        outfile.write(f"Root folder: {os.path.abspath(root_dir)}\n\n")
-        
-        for dirpath, dirnames, filenames in os.walk(root_dir):
-            # Skip folders that are in the SKIP_FOLDERS list
-            dirnames[:] = [d for d in dirnames if d not in SKIP_FOLDERS]
-
-            for filename in filenames:
-                if filename.endswith(INCLUDE_FILES):
-                    file_path = os.path.join(dirpath, filename)
-                    rel_path = os.path.relpath(file_path, root_dir)
-                    outfile.write(f"[{rel_path}]\n")
-                   
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as infile:
-                            outfile.write(infile.read())
-                    except Exception as e:
-                        outfile.write(f"Error reading file: {str(e)}\n")
-                   
-                    outfile.write("\n\n")  # Add extra newlines between files
+    if walk_and_concat is not None:
+        with open_output(output_file) as outfile:
+            outfile.write(f"Root folder: {os.path.abspath(root_dir)}\n\n".encode('utf-8'))
+            outfile.flush()
+            walk_and_concat(os.fsencode(root_dir), outfile.fileno(),
+                            [ext.encode('utf-8') for ext in INCLUDE_FILES],
+                            {os.fsencode(folder) for folder in SKIP_FOLDERS_SET})
+        return
+
+    with open_output(output_file, buffering=COPY_BUFFER_SIZE) as outfile, \
+            ThreadPoolExecutor(max_workers=READ_WORKERS) as pool:
+        outfile.write(f"Root folder: {os.path.abspath(root_dir)}\n\n".encode('utf-8'))
+
+        # Entry paths all start with root_dir plus a separator, so slicing replaces relpath
+        root_prefix_len = len(os.path.join(root_dir, ''))
+        entries = iter_files(root_dir)
+        try:
+            while True:
+                # Read each batch of small files in parallel, then write it in walk order
+                chunk = list(islice(entries, BATCH_FILES))
+                if not chunk:
+                    break
+
+                batch = []
+                for entry, data in zip(chunk, pool.map(read_small_file, chunk)):
+                    rel_path = entry.path[root_prefix_len:]
+                    batch.append(b"[" + rel_path.encode('utf-8') + b"]\n")
+
+                    if data is None:
+                        write_batch(outfile, batch)
+                        batch.clear()
+                        try:
+                            # The DirEntry keeps the stat taken by read_small_file
+                            copy_file_contents(entry.path, outfile, entry.stat().st_size)
+                        except Exception as e:
+                            data = e
+                    if isinstance(data, Exception):
+                        batch.append(f"Error reading file: {str(data)}\n".encode('utf-8'))
+                    elif data:
+                        batch.append(data)
+
+                    batch.append(NEWLINES)  # Add extra newlines between files
+
+                write_batch(outfile, batch)
+        finally:
+            # Stop the walker threads even when writing fails part way through
+            entries.close()
+
+def open_output(output_file: str, buffering: int = -1):
+    """
+    Open the output file for writing at its end, creating it if needed.
+    Linux sendfile rejects an output fd opened with O_APPEND, so instead of 'ab'
+    the file is opened for writing and positioned at its end with a seek.
+    Args:
+    output_file (str): The file to write to.
+    buffering (int): The buffer size, as for open().
+    Returns:
+    The binary file object, positioned at the end of the file.
+    """
+    outfile = open(os.open(output_file, os.O_WRONLY | os.O_CREAT, 0o666), 'wb', buffering=buffering)
+    outfile.seek(0, os.SEEK_END)
+    return outfile
+
+def read_small_file(entry: os.DirEntry) -> Union[bytes, None, Exception]:
+    """
+    Read a file of at most SMALL_FILE_SIZE bytes with a single positional read.
+    os.pread does not share a file offset, so it is safe to call from many threads.
+    Args:
+    entry (os.DirEntry): The file to read.
+    Returns:
+    bytes | None | Exception: The contents, None if the file is too large to batch,
+    or the error raised while reading it.
+    """
+    try:
+        size = entry.stat().st_size
+        if size > SMALL_FILE_SIZE:
+            return None
+        if not hasattr(os, 'pread'):
+            with open(entry.path, 'rb') as infile:
+                return infile.read()
+        fd = os.open(entry.path, os.O_RDONLY)
+        try:
+            return os.pread(fd, size, 0)
+        finally:
+            os.close(fd)
+    except Exception as e:
+        return e
+
+def write_batch(outfile, batch: list) -> None:
+    """
+    Append a list of byte strings to the output file, using os.writev where available
+    so a whole batch of headers, bodies and separators goes out in a single system call.
+    Args:
+    outfile: The binary file object to append to.
+    batch (list): The byte strings to write, in order.
+    """
+    if not hasattr(os, 'writev'):
+        outfile.writelines(batch)
+        return
+
+    # writev goes straight to the fd, so anything still buffered must land first
+    outfile.flush()
+    fd = outfile.fileno()
+    buffers = [memoryview(data) for data in batch if data]
+    index = 0
+    while index < len(buffers):
+        written = os.writev(fd, buffers[index:index + IOV_MAX])
+        # Skip past fully written buffers and trim one that was only partly written
+        while written:
+            size = len(buffers[index])
+            if written < size:
+                buffers[index] = buffers[index][written:]
+                break
+            written -= size
+            index += 1
+
+def copy_file_contents(file_path: str, outfile, size: int) -> None:
+    """
+    Append the raw bytes of a file to an open binary output file.
+    Uses os.sendfile on Linux so the data never passes through Python; outfile must
+    therefore not be in append mode (see open_output).
+    Only where sendfile is unsupported (other platforms, or a file system that refuses
+    it) are files above MMAP_THRESHOLD written from a read-only mmap of the page cache;
+    smaller ones are then copied with shutil.copyfileobj.
+    Args:
+    file_path (str): The file to copy.
+    outfile: The binary file object to append to.
+    size (int): The size of the file, as already known from the directory walk.
+    """
+    with open(file_path, 'rb') as infile:
+        if SENDFILE_TO_FILE:
+            # Anything still buffered must land before the kernel appends to the fd
+            outfile.flush()
+            in_fd = infile.fileno()
+            offset = 0
+            try:
+                while offset < size:
+                    sent = os.sendfile(outfile.fileno(), in_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                return
+            except OSError as e:
+                # Only a file system without sendfile support falls back, and only before any copying
+                if offset or e.errno not in (errno.EINVAL, errno.ENOSYS):
+                    raise
+        if size > MMAP_THRESHOLD:
+            with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                outfile.write(mm)
+            return
+        shutil.copyfileobj(infile, outfile, length=COPY_BUFFER_SIZE)
+
+def iter_files(root_dir: str) -> Iterator[os.DirEntry]:
+    """
+    Yield entries for files matching INCLUDE_FILES, skipping folders in SKIP_FOLDERS.
+    Args:
+    root_dir (str): The root directory to start walking from.
+    Yields:
+    os.DirEntry: Entries of the matching files.
+    """
+    return walk_files(root_dir, INCLUDE_FILES, SKIP_FOLDERS_SET)
+
+def walk_files(root_dir: str, include_files: Tuple[str, ...], skip_folders: Collection[str],
+               workers: int = WALK_WORKERS,
+               onerror: Optional[Callable[[OSError], None]] = None) -> Iterator[os.DirEntry]:
+    """
+    Walk a directory tree with os.scandir on a pool of threads and yield matching file entries.
+    Every discovered subfolder is queued for whichever thread is free next, so wide trees are
+    listed in parallel. Files are yielded in the order their folders finish, which can vary
+    between runs. DirEntry carries the file type from the listing, so no stat call is made.
+    Args:
+    root_dir (str): The root directory to start walking from.
+    include_files (tuple): File name suffixes to include.
+    skip_folders (Collection[str]): Folder names not to descend into.
+    workers (int): The number of listing threads.
+    onerror (callable): Called with the OSError for a folder that cannot be listed.
+    Yields:
+    os.DirEntry: Entries of the matching files.
+    """
+    pending_dirs = queue.Queue()
+    results = queue.Queue()
+
+    def scan_dirs() -> None:
+        while True:
+            dirpath = pending_dirs.get()
+            if dirpath is None:
+                return
+            files, subdirs, error = [], [], None
+            try:
+                try:
+                    with os.scandir(dirpath) as it:
+                        for entry in it:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in skip_folders:
+                                    subdirs.append(entry.path)
+                            # Anything that is not a folder counts as a file, as with os.walk,
+                            # so broken symlinks still get an error block in the output
+                            elif entry.name.endswith(include_files) and not entry.is_dir():
+                                files.append(entry)
+                except OSError as e:
+                    if onerror is not None:
+                        onerror(e)
+            except Exception as e:
+                # Hand the error to the consumer; a missing result would leave it waiting forever
+                error = e
+            results.put((files, subdirs, error))
+
+    # Daemon threads, so a generator that is never closed cannot hold up interpreter exit
+    workers = max(1, workers)
+    for _ in range(workers):
+        threading.Thread(target=scan_dirs, daemon=True).start()
+    pending_dirs.put(root_dir)
+    try:
+        # Subfolders are queued here, after their parent is counted as done,
+        # so the walk cannot look finished while a parent's result is in flight
+        outstanding = 1
+        while outstanding:
+            files, subdirs, error = results.get()
+            if error is not None:
+                raise error
+            outstanding += len(subdirs) - 1
+            for dirpath in subdirs:
+                pending_dirs.put(dirpath)
+            yield from files
+    finally:
+        # Drop folders nobody has started (if the caller stopped early) and release the threads
+        try:
+            while True:
+                pending_dirs.get_nowait()
+        except queue.Empty:
+            pass
+        for _ in range(workers):
+            pending_dirs.put(None)
 
 def get_output_filename(root_dir: str) -> str:
     """
@@ -1,17 +1,36 @@
+import os
 import sys
 import logging
+import mmap
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Tuple, Optional, Set
+from typing import Iterable, Iterator, List, Tuple, Optional, Set, Union
 from dataclasses import dataclass
 import json
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                            QHBoxLayout, QTextEdit, QPushButton, QLabel, 
+                            QHBoxLayout, QPlainTextEdit, QPushButton, QLabel, 
                             QFileDialog, QLineEdit, QMessageBox, QToolBar,
                             QAction, QDialog, QGroupBox, QShortcut)
-from PyQt5.QtCore import Qt, QSettings
+from PyQt5.QtCore import Qt, QSettings, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon, QKeySequence
 
+from flatten_file_data import walk_files
+
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,6 +44,17 @@ DEFAULT_SKIP_FOLDERS = {'tests', 'static', '__pycache__', 'i18n'}
 WINDOW_TITLE = "Directory Content Generator"
 WINDOW_MIN_SIZE = (800, 600)
 SETTINGS_FILE = 'config.json'
+WRITE_BUFFER_SIZE = 1 << 20
+PREVIEW_SIZE = 256 * 1024
+# Parallel reads contend on the volume lock on macOS, so keep the pool smaller there
+MAX_READ_WORKERS = min(4 if sys.platform == 'darwin' else 8, os.cpu_count() or 1)
+READ_AHEAD = 64
+READ_CACHE_SIZE = 16384
+# The cache lives across scans, so bound its total size; larger files are reread every scan
+READ_CACHE_MAX_BYTES = 256 * 1024 * 1024
+READ_CACHE_MAX_FILE_SIZE = 256 * 1024
+URING_BATCH_SIZE = 64
+URING_RING_SIZE = 128
 
 class ConfigurationError(Exception):
     """Custom exception for configuration-related errors."""
@@ -50,8 +80,11 @@ class Configuration:
                 'include_files': list(self.include_files),
                 'skip_folders': list(self.skip_folders)
             }
-            with filepath.open('w') as f:
-                json.dump(config_data, f, indent=4)
+            if orjson is not None:
+                filepath.write_bytes(orjson.dumps(config_data, option=orjson.OPT_INDENT_2))
+            else:
+                with filepath.open('w') as f:
+                    json.dump(config_data, f, indent=4)
         except Exception as e:
             logger.error(f"Failed to save configuration: {e}")
             raise ConfigurationError(f"Could not save configuration: {e}")
@@ -63,8 +96,11 @@ class Configuration:
             if not filepath.exists():
                 return cls.get_defaults()
             
-            with filepath.open('r') as f:
-                config_data = json.load(f)
+            if orjson is not None:
+                config_data = orjson.loads(filepath.read_bytes())
+            else:
+                with filepath.open('r') as f:
+                    config_data = json.load(f)
             
             return cls(
                 include_files=set(config_data.get('include_files', DEFAULT_FILE_EXTENSIONS)),
@@ -132,48 +168,316 @@ class ConfigDialog(QDialog):
             skip_folders={folder.strip() for folder in self.folders_input.text().split(',') if folder.strip()}
         )
 
+class FileCache:
+    """Thread-safe LRU of file contents, keyed by path, mtime and size from the walk's stat.
+    Cached buffers are shared between scans and must not be modified once stored."""
+
+    def __init__(self, maxsize: int = READ_CACHE_SIZE, max_bytes: int = READ_CACHE_MAX_BYTES,
+                 max_file_size: int = READ_CACHE_MAX_FILE_SIZE):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.max_file_size = max_file_size
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(entry: os.DirEntry) -> Tuple[str, int, int]:
+        st = entry.stat()
+        return entry.path, st.st_mtime_ns, st.st_size
+
+    def get(self, key: Tuple[str, int, int]) -> Optional[Union[bytes, bytearray]]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key: Tuple[str, int, int], data: Union[bytes, bytearray]) -> Union[bytes, bytearray]:
+        """Cache data if the file is small enough and return it; the caller must not modify it."""
+        if key[2] > self.max_file_size:
+            return data
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = data
+            self._bytes += len(data)
+            # Evict least recently used files until both the entry and byte limits hold
+            while len(self._entries) > self.maxsize or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+        return data
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+file_cache = FileCache()
+
+def _read_file(path: str, size: int) -> Union[bytes, bytearray]:
+    """Read a file's bytes into a buffer sized from the walk's stat."""
+    if not hasattr(os, 'preadv'):
+        with open(path, 'rb') as f:
+            return f.read()
+    # Positional reads do not share a file offset, so pool threads never contend on one
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return _read_into(fd, bytearray(size))
+    finally:
+        os.close(fd)
+
+def _read_into(fd: int, buffer: bytearray, done: int = 0) -> bytearray:
+    """Fill a preallocated buffer from the start of fd, trimming it if the file is shorter."""
+    view = memoryview(buffer)
+    while done < len(buffer):
+        count = os.preadv(fd, [view[done:]], done)
+        if count == 0:
+            del view
+            del buffer[done:]
+            break
+        done += count
+    return buffer
+
 class DirectoryScanner:
     """Handles directory scanning and content generation."""
     
     def __init__(self, config: Configuration):
         self.config = config
 
-    def scan_directory(self, root_dir: Path) -> str:
-        """Scan directory and generate content."""
+    @property
+    def config(self) -> Configuration:
+        return self._config
+
+    @config.setter
+    def config(self, config: Configuration) -> None:
+        # Precompute the filters once per configuration rather than per path
+        self._config = config
+        self._ext_tuple = tuple(config.include_files)
+        self._skip_fset = frozenset(config.skip_folders)
+
+    def scan_directory(self, root_dir: Path, output_path: Path) -> int:
+        """Scan directory, write the generated content to output_path and return its line count."""
         if not root_dir.is_dir():
             raise ValueError(f"Invalid directory: {root_dir}")
 
-        content = []
-        content.append(f"Root folder: {root_dir.absolute()}\n")
+        # Lines are counted as newlines + 1, matching how the text was counted before
+        total_lines = 1
+        with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as out:
+            out.write(f"Root folder: {root_dir.absolute()}\n".encode('utf-8'))
+            total_lines += 1
+
+            # Entry paths all start with root_dir plus a separator, so slicing replaces relative_to
+            root_prefix_len = len(os.path.join(root_dir, ''))
+            for entry, data in self._read_files(self._iterate_files(root_dir)):
+                rel_path = entry.path[root_prefix_len:]
+                out.write(f"\n[{rel_path}]\n".encode('utf-8'))
+
+                if isinstance(data, Exception):
+                    logger.error(f"Error reading file {entry.path}: {data}")
+                    data = f"Error reading file: {str(data)}".encode('utf-8')
+                out.write(data)
+
+                out.write(b"\n\n")
+                total_lines += data.count(b'\n') + 4
+
+        return total_lines
+
+    def _read_files(self, entries: Iterable[os.DirEntry]) -> Iterator[Tuple[os.DirEntry, Union[bytes, Exception]]]:
+        """Read files on a thread pool while the walk continues, yielding results in walk order."""
+        pending: deque = deque()
+        with ThreadPoolExecutor(max_workers=MAX_READ_WORKERS) as pool:
+            for entry in entries:
+                pending.append((entry, pool.submit(self._read_file, entry)))
+                # Bound the read-ahead so memory stays flat on large trees
+                if len(pending) >= READ_AHEAD:
+                    yield self._collect(*pending.popleft())
+            while pending:
+                yield self._collect(*pending.popleft())
+
+    @staticmethod
+    def _read_file(entry: os.DirEntry) -> Union[bytes, bytearray]:
+        """Read a file, reusing the cached bytes if it has not changed since the last scan."""
+        key = file_cache.key(entry)
+        data = file_cache.get(key)
+        if data is None:
+            data = file_cache.put(key, _read_file(entry.path, key[2]))
+        return data
+
+    @staticmethod
+    def _collect(entry: os.DirEntry, future: Future) -> Tuple[os.DirEntry, Union[bytes, Exception]]:
+        try:
+            return entry, future.result()
+        except Exception as e:
+            return entry, e
+
+    def _iterate_files(self, root_dir: Path) -> Iterator[os.DirEntry]:
+        """Iterator for matching files in directory, listed in parallel with os.scandir."""
+        def log_error(e: OSError) -> None:
+            logger.warning(f"Cannot scan directory {e.filename}: {e}")
+
+        return walk_files(os.fspath(root_dir), self._ext_tuple, self._skip_fset, onerror=log_error)
+
+def read_preview(path: Path, limit: int = PREVIEW_SIZE) -> str:
+    """Read a bounded preview of a generated file: all of it if small, else its head and tail."""
+    size = path.stat().st_size
+    if size == 0:
+        return ""
+
+    with path.open('rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if size <= limit:
+            return mm[:].decode('utf-8', errors='replace')
+
+        # Cut on line boundaries so the preview does not start or end mid-line
+        half = limit // 2
+        head_end = mm.rfind(b'\n', 0, half) + 1 or half
+        tail_start = mm.find(b'\n', size - half) + 1 or size - half
+        omitted = tail_start - head_end
+        return (mm[:head_end].decode('utf-8', errors='replace')
+                + f"\n... {omitted:,} bytes omitted from preview, use Save or Copy for the full content ...\n\n"
+                + mm[tail_start:].decode('utf-8', errors='replace'))
+
+class UringDirectoryScanner(DirectoryScanner):
+    """DirectoryScanner that batches file open/read/close through io_uring (Linux, needs liburing).
+    Files still in the read cache are served from it and never reach the ring."""
+
+    def _read_files(self, entries: Iterable[os.DirEntry]) -> Iterator[Tuple[os.DirEntry, Union[bytes, Exception]]]:
+        ring = liburing.Ring()
+        cqe = liburing.Cqe()
+        try:
+            liburing.io_uring_queue_init(URING_RING_SIZE, ring)
+        except OSError as e:
+            logger.warning(f"io_uring unavailable, falling back to thread pool reads: {e}")
+            yield from super()._read_files(entries)
+            return
 
-        for file_path in self._iterate_files(root_dir):
-            rel_path = file_path.relative_to(root_dir)
-            content.append(f"[{rel_path}]")
-            
+        try:
+            batch: List[os.DirEntry] = []
+            for entry in entries:
+                batch.append(entry)
+                if len(batch) == URING_BATCH_SIZE:
+                    yield from self._read_batch(ring, cqe, batch)
+                    batch = []
+            if batch:
+                yield from self._read_batch(ring, cqe, batch)
+        finally:
+            liburing.io_uring_queue_exit(ring)
+
+    def _read_batch(self, ring, cqe, entries: List[os.DirEntry]) -> List[Tuple[os.DirEntry, Union[bytes, Exception]]]:
+        """Open, read and close the uncached files of a batch with one submission per phase."""
+        results: List[Union[bytes, bytearray, Exception]] = [b''] * len(entries)
+        keys = {}
+        for index, entry in enumerate(entries):
             try:
-                content.append(file_path.read_text(encoding='utf-8'))
-            except Exception as e:
-                logger.error(f"Error reading file {file_path}: {e}")
-                content.append(f"Error reading file: {str(e)}")
-            
-            content.append("\n")
+                key = file_cache.key(entry)
+            except OSError as e:
+                results[index] = e
+                continue
+            data = file_cache.get(key)
+            if data is not None:
+                results[index] = data
+                continue
+            keys[index] = key
+            sqe = liburing.io_uring_get_sqe(ring)
+            liburing.io_uring_prep_open(sqe, entry.path, os.O_RDONLY)
+            liburing.io_uring_sqe_set_data64(sqe, index)
+        fds = {}
+        for index, res in self._complete(ring, cqe, len(keys)):
+            if res < 0:
+                results[index] = OSError(-res, os.strerror(-res), entries[index].path)
+            else:
+                fds[index] = res
 
-        return "\n".join(content)
+        try:
+            buffers = {}
+            for index, fd in fds.items():
+                # Size the buffer from the walk's stat rather than an fstat per file
+                size = keys[index][2]
+                if size:
+                    buffers[index] = bytearray(size)
+                    sqe = liburing.io_uring_get_sqe(ring)
+                    liburing.io_uring_prep_read(sqe, fd, buffers[index], 0)
+                    liburing.io_uring_sqe_set_data64(sqe, index)
+            for index, res in self._complete(ring, cqe, len(buffers)):
+                if res < 0:
+                    results[index] = OSError(-res, os.strerror(-res), entries[index].path)
+                else:
+                    # Complete short reads synchronously so large files are never truncated;
+                    # a failure stays with its file so the remaining completions are still reaped
+                    try:
+                        results[index] = _read_into(fds[index], buffers[index], res)
+                    except OSError as e:
+                        results[index] = e
+        finally:
+            for index, fd in fds.items():
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_close(sqe, fd)
+                liburing.io_uring_sqe_set_data64(sqe, index)
+            for _ in self._complete(ring, cqe, len(fds)):
+                pass
+
+        for index in fds:
+            if not isinstance(results[index], Exception):
+                results[index] = file_cache.put(keys[index], results[index])
+        return list(zip(entries, results))
+
+    @staticmethod
+    def _complete(ring, cqe, count: int) -> Iterator[Tuple[int, int]]:
+        """Submit queued entries and yield (index, result) for each of count completions."""
+        liburing.io_uring_submit(ring)
+        for _ in range(count):
+            liburing.io_uring_wait_cqe(ring, cqe)
+            completion = cqe[0]
+            index = completion.user_data
+            try:
+                res = completion.res
+            except OSError as e:
+                # liburing raises for a failed operation instead of returning -errno
+                res = -e.errno
+            liburing.io_uring_cqe_seen(ring, completion)
+            yield index, res
+
+def create_scanner(config: Configuration) -> DirectoryScanner:
+    """Return the fastest scanner available on this platform."""
+    if liburing is not None and sys.platform.startswith('linux'):
+        return UringDirectoryScanner(config)
+    return DirectoryScanner(config)
+
+class ScanWorker(QThread):
+    """Runs a DirectoryScanner off the GUI thread."""
+    content_ready = pyqtSignal(str)
+    line_count_changed = pyqtSignal(int)
+    scan_failed = pyqtSignal(str)
+
+    def __init__(self, scanner: DirectoryScanner, root_dir: Path, output_path: Path,
+                 parent: Optional[QWidget] = None):
+        super().__init__(parent)
+        self.scanner = scanner
+        self.root_dir = root_dir
+        self.output_path = output_path
 
-    def _iterate_files(self, root_dir: Path):
-        """Iterator for matching files in directory."""
-        for path in root_dir.rglob('*'):
-            if path.is_file() and any(str(path).endswith(ext) for ext in self.config.include_files):
-                if not any(skip in path.parts for skip in self.config.skip_folders):
-                    yield path
+    def run(self) -> None:
+        try:
+            total_lines = self.scanner.scan_directory(self.root_dir, self.output_path)
+            preview = read_preview(self.output_path)
+        except Exception as e:
+            logger.error(f"Error generating content: {e}", exc_info=True)
+            self.output_path.unlink(missing_ok=True)
+            self.scan_failed.emit(str(e))
+            return
+        self.line_count_changed.emit(total_lines)
+        self.content_ready.emit(preview)
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.config = Configuration.load()
-        self.scanner = DirectoryScanner(self.config)
+        self.scanner = create_scanner(self.config)
         self.previous_path = None
         self.previous_line_count = 0
+        self._full_output_path: Optional[Path] = None
+        self._worker: Optional[ScanWorker] = None
         self._setup_ui()
         self._setup_shortcuts()
 
@@ -196,7 +500,8 @@ class MainWindow(QMainWindow):
         self._create_action("Browse", self.browse_folder, QKeySequence.Open)
         self.toolbar.addSeparator()
         self._create_action("Settings", self.show_config_dialog, QKeySequence.Preferences)
-        self._create_action("Generate", self.generate_content, QKeySequence("Ctrl+G"))
+        self.generate_action = self._create_action("Generate", self.generate_content, QKeySequence("Ctrl+G"))
+        self._create_action("Clear Cache", self.clear_cache)
         self.toolbar.addSeparator()
         self._create_action("Copy", self.copy_to_clipboard, QKeySequence.Copy)
         self._create_action("Save", self.save_to_file, QKeySequence.Save)
@@ -207,17 +512,16 @@ class MainWindow(QMainWindow):
         layout = QVBoxLayout(central_widget)
         
         # Create text display area
-        self.text_display = QTextEdit()
+        self.text_display = QPlainTextEdit()
         self.text_display.setReadOnly(True)
         self.text_display.setFont(QFont('Courier', 10))
-        self.text_display.textChanged.connect(self._update_line_count)
         layout.addWidget(self.text_display)
         
         # Create status bar
         self.statusBar = self.statusBar()
-        self._update_line_count()
+        self._update_line_count(0)
 
-    def _create_action(self, text: str, slot, shortcut: Optional[QKeySequence] = None) -> None:
+    def _create_action(self, text: str, slot, shortcut: Optional[QKeySequence] = None) -> QAction:
         """Helper method to create toolbar actions."""
         action = QAction(text, self)
         if shortcut:
@@ -227,14 +531,13 @@ class MainWindow(QMainWindow):
 
         action.triggered.connect(slot)
         self.toolbar.addAction(action)
+        return action
 
-    def _update_line_count(self) -> None:
-        """Update the line count in the status bar."""
-        text = self.text_display.toPlainText()
+    def _update_line_count(self, current_line_count: int) -> None:
+        """Update the line count in the status bar from the count reported by the scanner."""
         current_path = Path(self.folder_input.text()) if self.folder_input.text() else None
         
-        if text:
-            current_line_count = text.count('\n') + 1
+        if current_line_count:
             status_message = f"Total lines: {current_line_count:,}"
             
             if (current_path and self.previous_path 
@@ -262,8 +565,16 @@ class MainWindow(QMainWindow):
         if dialog.exec_() == QDialog.Accepted:
             self.config = dialog.get_config()
             self.scanner.config = self.config
+            # Drop cached files the new configuration may no longer include
+            file_cache.clear()
             self.config.save()
 
+    def clear_cache(self) -> None:
+        """Forget cached file contents so the next scan rereads everything."""
+        file_cache.clear()
+        logger.info("File cache cleared")
+        self.statusBar.showMessage("File cache cleared")
+
     def browse_folder(self) -> None:
         """Open folder browser dialog."""
         folder = QFileDialog.getExistingDirectory(self, "Select Directory")
@@ -271,7 +582,10 @@ class MainWindow(QMainWindow):
             self.folder_input.setText(folder)
 
     def generate_content(self) -> None:
-        """Generate content from selected directory."""
+        """Start generating content from selected directory in the background."""
+        if self._worker and self._worker.isRunning():
+            return
+
         try:
             root_dir = Path(self.folder_input.text())
             if not root_dir.is_dir():
@@ -280,10 +594,16 @@ class MainWindow(QMainWindow):
             if not self.config.include_files:
                 raise ConfigurationError("No file extensions configured")
 
-            content = self.scanner.scan_directory(root_dir)
-            self.text_display.setText(content)
-            logger.info("Content generated successfully")
-            QMessageBox.information(self, "Success", "Content generated successfully!")
+            fd, output_file = tempfile.mkstemp(prefix='directory_content_', suffix='.txt')
+            os.close(fd)
+
+            self._worker = ScanWorker(self.scanner, root_dir, Path(output_file), self)
+            self._worker.line_count_changed.connect(self._update_line_count)
+            self._worker.content_ready.connect(self._on_content_ready)
+            self._worker.scan_failed.connect(self._on_scan_failed)
+            self.generate_action.setEnabled(False)
+            self.statusBar.showMessage(f"Scanning {root_dir}...")
+            self._worker.start()
             
         except (ValueError, ConfigurationError) as e:
             logger.error(f"Error generating content: {e}")
@@ -292,27 +612,55 @@ class MainWindow(QMainWindow):
             logger.error(f"Unexpected error: {e}", exc_info=True)
             QMessageBox.critical(self, "Error", f"An unexpected error occurred: {e}")
 
+    def _on_content_ready(self, preview: str) -> None:
+        """Show the result of a finished scan."""
+        self.generate_action.setEnabled(True)
+        self._discard_output()
+        self._full_output_path = self._worker.output_path
+        self.text_display.setPlainText(preview)
+        logger.info("Content generated successfully")
+        QMessageBox.information(self, "Success", "Content generated successfully!")
+
+    def _on_scan_failed(self, message: str) -> None:
+        """Report a scan that failed in the worker thread."""
+        self.generate_action.setEnabled(True)
+        self.statusBar.showMessage("Scan failed")
+        QMessageBox.critical(self, "Error", f"An unexpected error occurred: {message}")
+
+    def _discard_output(self) -> None:
+        """Remove the temporary file holding the last generated content."""
+        if self._full_output_path:
+            self._full_output_path.unlink(missing_ok=True)
+            self._full_output_path = None
+
+    def closeEvent(self, event) -> None:
+        if self._worker:
+            self._worker.wait()
+            if self._worker.output_path != self._full_output_path:
+                self._worker.output_path.unlink(missing_ok=True)
+        self._discard_output()
+        super().closeEvent(event)
+
     def copy_to_clipboard(self) -> None:
         """Copy content to clipboard."""
-        content = self.text_display.toPlainText()
-        if not content:
+        if not self._full_output_path:
             QMessageBox.warning(self, "Error", "No content to copy!")
             return
             
+        content = self._full_output_path.read_text(encoding='utf-8', errors='replace')
         QApplication.clipboard().setText(content)
         logger.info("Content copied to clipboard")
         QMessageBox.information(self, "Success", "Content copied to clipboard!")
 
     def save_to_file(self) -> None:
         """Save content to file."""
-        content = self.text_display.toPlainText()
-        if not content:
+        if not self._full_output_path:
             QMessageBox.warning(self, "Error", "No content to save!")
             return
             
         filename = f"directory_content_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         try:
-            Path(filename).write_text(content, encoding='utf-8')
+            shutil.copyfile(self._full_output_path, filename)
             logger.info(f"Content saved to {filename}")
             QMessageBox.information(self, "Success", f"Saved to {filename}")
         except Exception as e: